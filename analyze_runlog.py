@@ -1,12 +1,47 @@
+import csv
+import hashlib
+import importlib.util
+import json
 import os
 import sys
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+try:
+	from numba import njit
+except ImportError:  # numba is optional; sequence runs fall back to NumPy
+	njit = None
+
+# Plotly output: orjson serialization when available (it is optional; otherwise plotly
+# keeps the stdlib json encoder), and no default template embedded in each HTML file
+if importlib.util.find_spec("orjson") is not None:
+	pio.json.config.default_engine = "orjson"
+pio.templates.default = "none"
 
 # Configuration
 RUNLOG_PATH = r"Z:\Aerotech USA\03. Aerotech USA\4. Manufacturing\METROLOGY\RunLog.csv"
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 STOP_VALUE = "Stopped"
+CSV_BLOCK_SIZE = 64 << 20  # bytes per streamed RunLog block
+# RunLog timestamp formats, most common first
+RUNLOG_DATETIME_FORMATS = ["%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "ISO8601"]
+CACHE_MANIFEST = ".cache_manifest.json"
+CACHE_HASH_BYTES = 1 << 20  # leading bytes of RunLog.csv hashed into the manifest
+OUTPUT_FILES = [
+	"stopped_events.csv",
+	"stops_per_user.html",
+	"stops_per_test.html",
+	"stops_per_part.html",
+	"stops_per_stage.html",
+	"consecutive_stops_sequences.csv",
+	"consecutive_stops_hist.html",
+]
 
 # Expected columns (based on sample testcsv.csv)
 COL_ABORTED = "Aborted"
@@ -15,36 +50,87 @@ COL_TEST_NAME = "Test Name"
 COL_TEST_DATETIME = "Test Date Time"
 COL_PART_NUMBER = "Part Number"
 COL_STAGE_SERIAL = "Stage Serial Number"
+REQUIRED_COLUMNS = [COL_ABORTED, COL_USER, COL_TEST_NAME, COL_TEST_DATETIME, COL_PART_NUMBER, COL_STAGE_SERIAL]
+CATEGORY_COLUMNS = ["user_name", "test_name", "part_number", "stage_serial"]
 
 
 def ensure_output_dir() -> None:
 	os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+def stop_mask(aborted: pa.DictionaryArray) -> pa.BooleanArray:
+	# Normalize and compare the distinct dictionary values only, then broadcast through the indices
+	values = pc.utf8_lower(pc.utf8_trim_whitespace(aborted.dictionary))
+	return pc.take(pc.equal(values, STOP_VALUE.casefold()), aborted.indices)
+
+
 def read_runlog(csv_path: str) -> pd.DataFrame:
+	"""
+	Read the required RunLog columns and keep only the stopped runs.
+	The stop filter runs on each Arrow block so the full log is never materialized.
+	"""
 	if not os.path.exists(csv_path):
 		raise FileNotFoundError(f"RunLog.csv not found at: {csv_path}")
-	# Use low_memory=False for mixed dtypes
-	df = pd.read_csv(csv_path, low_memory=False)
-	return df
+	# Check the header up front; Arrow would otherwise fail on the first missing include column
+	with open(csv_path, newline="", encoding="utf-8-sig", errors="replace") as f:
+		header = next(csv.reader(f), [])
+	missing = [c for c in REQUIRED_COLUMNS if c not in header]
+	if missing:
+		raise KeyError(f"Missing expected columns: {missing}")
+	# Read everything as text; datetimes are parsed (with coercion) after filtering.
+	# Aborted has only a handful of distinct values, so it is dictionary-encoded while parsing.
+	column_types = {c: pa.string() for c in REQUIRED_COLUMNS}
+	column_types[COL_ABORTED] = pa.dictionary(pa.int32(), pa.string())
+	# strings_can_be_null keeps empty fields missing (NaN), as pd.read_csv did
+	convert_options = pacsv.ConvertOptions(
+		include_columns=REQUIRED_COLUMNS,
+		column_types=column_types,
+		strings_can_be_null=True,
+	)
+	# Free-text columns (e.g. Comment) may hold quoted line breaks
+	parse_options = pacsv.ParseOptions(newlines_in_values=True)
+	# Stream the file in blocks and keep only stopped rows, so peak memory tracks the stops, not the log
+	read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+	reader = pacsv.open_csv(csv_path, read_options=read_options, parse_options=parse_options, convert_options=convert_options)
+	batches = []
+	for batch in reader:
+		batches.append(batch.filter(stop_mask(batch.column(COL_ABORTED))))
+	table = pa.Table.from_batches(batches, schema=reader.schema)
+	return table.to_pandas(types_mapper=pd.ArrowDtype)
 
 
 def normalize_datetime(df: pd.DataFrame, column: str) -> pd.DataFrame:
 	if column not in df.columns:
 		raise KeyError(f"Missing expected column: {column}")
-	# Parse datetimes
-	df[column] = pd.to_datetime(df[column], errors="coerce")
+	# Parse datetimes with the RunLog format (C fast path); values that do not match it
+	# are retried with the other known formats. Anything left over becomes NaT.
+	# The column is held in one fixed unit, whichever format matched
+	values = df[column]
+	parsed = pd.to_datetime(values, format=RUNLOG_DATETIME_FORMATS[0], errors="coerce", cache=True).astype("datetime64[us]")
+	for fmt in RUNLOG_DATETIME_FORMATS[1:]:
+		unparsed = parsed.isna() & values.notna()
+		if not unparsed.any():
+			break
+		# utc=True so offsets (e.g. a trailing "Z") cannot raise; results are stored as naive UTC
+		retry = pd.to_datetime(values[unparsed], format=fmt, errors="coerce", cache=True, utc=True).dt.tz_convert(None)
+		# Widen the column rather than truncate retried values finer than microseconds
+		if retry.dt.unit == "ns" and bool((retry.dt.nanosecond != 0).any()):
+			parsed = parsed.astype("datetime64[ns]")
+		parsed[unparsed] = retry.astype(parsed.dtype)
+	df[column] = parsed
 	return df
 
 
 def filter_stops(df: pd.DataFrame) -> pd.DataFrame:
-	missing = [c for c in [COL_ABORTED, COL_USER, COL_TEST_NAME, COL_TEST_DATETIME, COL_PART_NUMBER, COL_STAGE_SERIAL] if c not in df.columns]
+	"""
+	Shape the stopped runs returned by read_runlog: renamed columns, parsed datetimes, normalized user names.
+	Rows are not filtered on Aborted here; read_runlog already did that.
+	"""
+	missing = [c for c in [COL_USER, COL_TEST_NAME, COL_TEST_DATETIME, COL_PART_NUMBER, COL_STAGE_SERIAL] if c not in df.columns]
 	if missing:
 		raise KeyError(f"Missing expected columns: {missing}")
-	stops = df[df[COL_ABORTED].astype(str).str.strip().str.casefold() == STOP_VALUE.casefold()].copy()
-	stops = normalize_datetime(stops, COL_TEST_DATETIME)
-	# Keep only needed columns
-	stops = stops[[COL_USER, COL_TEST_NAME, COL_TEST_DATETIME, COL_PART_NUMBER, COL_STAGE_SERIAL]]
+	# Select the needed columns before anything is copied, so the Aborted column is never duplicated
+	stops = df[[COL_USER, COL_TEST_NAME, COL_TEST_DATETIME, COL_PART_NUMBER, COL_STAGE_SERIAL]]
 	stops = stops.rename(columns={
 		COL_USER: "user_name",
 		COL_TEST_NAME: "test_name",
@@ -52,17 +138,64 @@ def filter_stops(df: pd.DataFrame) -> pd.DataFrame:
 		COL_PART_NUMBER: "part_number",
 		COL_STAGE_SERIAL: "stage_serial",
 	})
+	stops = normalize_datetime(stops, "test_datetime")
 	# Normalize user names (strip whitespace and convert to lowercase)
 	stops["user_name"] = stops["user_name"].astype(str).str.strip().str.lower()
-	# Drop rows without a parsed datetime
-	stops = stops.dropna(subset=["test_datetime"]).sort_values("test_datetime").reset_index(drop=True)
+	# Drop rows without a parsed datetime and sort by time in a single row take
+	timestamps = stops["test_datetime"].to_numpy()
+	valid = np.flatnonzero(~np.isnat(timestamps))
+	# Default (quicksort) kind, as in sort_values, so rows with equal times come out in the same order
+	order = valid[np.argsort(timestamps[valid])]
+	stops = stops.iloc[order].reset_index(drop=True)
+	# Low-cardinality keys used by every groupby/sort downstream
+	for column in CATEGORY_COLUMNS:
+		stops[column] = stops[column].astype("category")
 	return stops
 
 
+def csv_needs_quoting(column: pa.ChunkedArray) -> bool:
+	# Mirrors csv.QUOTE_MINIMAL: only delimiters, quotes and line breaks need quoting
+	if pa.types.is_dictionary(column.type):
+		return any(csv_needs_quoting(pa.chunked_array([chunk.dictionary])) for chunk in column.chunks)
+	if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+		return False
+	return bool(pc.any(pc.match_substring_regex(column, r'[,"\r\n]')).as_py())
+
+
+def whole_second_timestamps(values: pd.Series) -> bool:
+	# to_csv prints these as "%Y-%m-%d %H:%M:%S"; it adds fractional digits when any value
+	# has them and drops the time entirely when every value is at midnight
+	values = values.dropna()
+	if values.empty:
+		return True
+	return bool((values == values.dt.floor("s")).all()) and not bool((values == values.dt.normalize()).all())
+
+
+def write_csv_table(df: pd.DataFrame, out_path: str) -> None:
+	"""
+	Write df exactly like DataFrame.to_csv(index=False), using pyarrow's multithreaded C++ writer.
+	Frames the Arrow writer cannot reproduce (quoted values, sub-second or date-only timestamps)
+	are written by pandas.
+	"""
+	datetime_columns = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
+	table = pa.Table.from_pandas(df, preserve_index=False)
+	if not all(whole_second_timestamps(df[c]) for c in datetime_columns) or any(csv_needs_quoting(column) for column in table.columns):
+		df.to_csv(out_path, index=False)
+		return
+	columns = [
+		pc.strftime(pc.cast(column, pa.timestamp("s")), format="%Y-%m-%d %H:%M:%S") if pa.types.is_timestamp(column.type) else column
+		for column in table.columns
+	]
+	table = pa.table(columns, names=table.column_names)
+	# to_csv ends lines with os.linesep
+	write_options = pacsv.WriteOptions(quoting_style="none", quoting_header="none", eol=os.linesep)
+	pacsv.write_csv(table, out_path, write_options=write_options)
+
+
 def save_stops_csv(stops: pd.DataFrame) -> str:
 	ensure_output_dir()
 	out_path = os.path.join(OUTPUT_DIR, "stopped_events.csv")
-	stops.to_csv(out_path, index=False)
+	write_csv_table(stops, out_path)
 	return out_path
 
 
@@ -74,46 +207,61 @@ def save_plotly_html(fig, filename: str) -> str:
 
 
 def plot_bar_series_html(series: pd.Series, title: str, x_label: str, y_label: str, filename: str, orientation: str = "h") -> str:
-	data = series.sort_values(ascending=False).reset_index()
-	data.columns = ["category", "count"]
+	# Series is expected to be sorted descending already (value_counts order)
+	# Build the trace directly from arrays; px.bar's DataFrame-to-trace inference is not needed here
+	categories = series.index.astype(str).to_numpy()
+	counts = series.to_numpy()
 	if orientation == "h":
-		fig = px.bar(data, x="count", y="category", orientation="h", text="count", title=title, labels={"count": y_label, "category": x_label})
-		fig.update_layout(yaxis={"categoryorder": "total ascending"})
+		fig = go.Figure(go.Bar(x=counts, y=categories, orientation="h", text=counts, hovertemplate=f"{y_label}=%{{x}}<br>{x_label}=%{{y}}<extra></extra>"))
+		fig.update_layout(xaxis_title=y_label, yaxis_title=x_label, yaxis={"categoryorder": "total ascending"})
 	else:
-		fig = px.bar(data, x="category", y="count", orientation="v", text="count", title=title, labels={"count": y_label, "category": x_label})
-		fig.update_layout(xaxis={"categoryorder": "total descending"})
+		fig = go.Figure(go.Bar(x=categories, y=counts, orientation="v", text=counts, hovertemplate=f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>"))
+		fig.update_layout(xaxis_title=x_label, yaxis_title=y_label, xaxis={"categoryorder": "total descending"})
 	fig.update_traces(textposition="auto")
-	fig.update_layout(margin=dict(l=60, r=20, t=60, b=60), height=700)
+	fig.update_layout(title=title, margin=dict(l=60, r=20, t=60, b=60), height=700)
 	return save_plotly_html(fig, filename)
 
 
-def plot_stops_per_user(stops: pd.DataFrame) -> str:
-	counts = stops.groupby("user_name").size()
+def plot_stops_per_user(counts: pd.Series) -> str:
 	return plot_bar_series_html(counts, "Stops per User", "User", "Stops", "stops_per_user.html", orientation="h")
 
 
-def plot_stops_per_test(stops: pd.DataFrame) -> str:
-	counts = stops.groupby("test_name").size()
+def plot_stops_per_test(counts: pd.Series) -> str:
 	return plot_bar_series_html(counts, "Stops per Test Name", "Test Name", "Stops", "stops_per_test.html", orientation="h")
 
 
-def plot_stops_per_part(stops: pd.DataFrame) -> str:
-	counts = stops.groupby("part_number").size()
+def plot_stops_per_part(counts: pd.Series) -> str:
 	return plot_bar_series_html(counts, "Stops per Part Number", "Part Number", "Stops", "stops_per_part.html", orientation="h")
 
 
+def join_unique_per_stage(stops: pd.DataFrame, column: str) -> pd.Series:
+	# De-duplicate and sort (stage, value) pairs up front so each group only needs a join;
+	# missing values are skipped
+	pairs = stops[["stage_serial", column]].dropna().drop_duplicates().sort_values(["stage_serial", column])
+	# astype(str): a group of one value would otherwise keep the categorical dtype
+	return pairs.groupby("stage_serial", observed=True)[column].agg(", ".join).astype(str)
+
+
 def plot_stops_per_stage(stops: pd.DataFrame) -> str:
-	# Group by stage_serial and aggregate user names and part numbers for hover data
-	stage_data = stops.groupby("stage_serial").agg({
-		"user_name": lambda x: ", ".join(sorted(set(x))),
-		"part_number": lambda x: ", ".join(sorted(set(x))),
-		"stage_serial": "size"
-	}).rename(columns={"stage_serial": "count"})
+	# Integer histogram over stage codes. Empty stage fields are read as null (code -1)
+	# and left out, as in groupby
+	stage_codes, stages = pd.factorize(stops["stage_serial"], sort=True)
+	counts = pd.Series(np.bincount(stage_codes[stage_codes >= 0], minlength=len(stages)), index=stages)
+	# Aggregate user names and part numbers per stage_serial for hover data
+	stage_data = pd.DataFrame({
+		"user_name": join_unique_per_stage(stops, "user_name"),
+		"part_number": join_unique_per_stage(stops, "part_number"),
+	}).reindex(counts.index).fillna("")
+	stage_data.index.name = "stage_serial"
+	stage_data["count"] = counts
 	
 	# Create custom hover text
-	stage_data["hover_text"] = stage_data.apply(
-		lambda row: f"Stage: {row.name}<br>Stops: {row['count']}<br>Users: {row['user_name']}<br>Parts: {row['part_number']}", 
-		axis=1
+	stage_labels = pd.Series(stage_data.index.astype(str), index=stage_data.index)
+	stage_data["hover_text"] = (
+		"Stage: " + stage_labels
+		+ "<br>Stops: " + stage_data["count"].astype(str)
+		+ "<br>Users: " + stage_data["user_name"]
+		+ "<br>Parts: " + stage_data["part_number"]
 	)
 	
 	# Create the plot with custom hover data
@@ -139,55 +287,99 @@ def plot_stops_per_stage(stops: pd.DataFrame) -> str:
 	return save_plotly_html(fig, "stops_per_stage.html")
 
 
-def analyze_consecutive_stops_by_test_stage(stops: pd.DataFrame) -> pd.DataFrame:
+def sort_codes(values: pd.Series) -> np.ndarray:
+	# Codes follow the sorted order of the values; missing values sort last, as with sort_values
+	codes, uniques = pd.factorize(values, sort=True)
+	codes[codes < 0] = len(uniques)
+	return codes
+
+
+def sequence_runs_numpy(test_codes: np.ndarray, stage_codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	# Change mask written in place, then one cumulative sweep for ids and one for run starts
+	n = test_codes.size
+	key_changed = np.empty(n, dtype=bool)
+	key_changed[0] = True
+	np.logical_or(test_codes[1:] != test_codes[:-1], stage_codes[1:] != stage_codes[:-1], out=key_changed[1:])
+
+	sequence_ids = np.cumsum(key_changed, dtype=np.int64)
+	positions = np.arange(n, dtype=np.int64)
+	run_starts = np.where(key_changed, positions, 0)
+	np.maximum.accumulate(run_starts, out=run_starts)
+	sequence_index = np.subtract(positions, run_starts, out=run_starts)
+	sequence_index += 1
+	return sequence_ids, sequence_index
+
+
+def sequence_runs_loop(test_codes: np.ndarray, stage_codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	# Single pass over the sorted codes; only worthwhile once compiled by numba
+	n = test_codes.size
+	sequence_ids = np.empty(n, np.int64)
+	sequence_index = np.empty(n, np.int64)
+	current_seq = 0
+	count = 0
+	last_test = -2
+	last_stage = -2
+	for i in range(n):
+		if test_codes[i] != last_test or stage_codes[i] != last_stage:
+			current_seq += 1
+			count = 1
+			last_test = test_codes[i]
+			last_stage = stage_codes[i]
+		else:
+			count += 1
+		sequence_ids[i] = current_seq
+		sequence_index[i] = count
+	return sequence_ids, sequence_index
+
+
+# (sequence_id, sequence_index) for keys already sorted so equal keys are adjacent
+sequence_runs = njit(cache=True)(sequence_runs_loop) if njit is not None else sequence_runs_numpy
+
+
+def sequence_bounds(sequence_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	# Positions of the first and last row of each run of equal, contiguous sequence ids
+	starts = np.ones(sequence_ids.size, dtype=bool)
+	starts[1:] = sequence_ids[1:] != sequence_ids[:-1]
+	first_idx = np.flatnonzero(starts)
+	last_idx = np.append(first_idx[1:] - 1, sequence_ids.size - 1)
+	return first_idx, last_idx
+
+
+def analyze_consecutive_stops_by_test_stage(stops: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
 	"""
 	Sequences: consecutive stops grouped by identical (test_name, stage_serial), ordered by time.
 	No time-window or user constraint.
+	Returns the sorted stops with sequence columns plus the first/last row positions of each sequence.
 	"""
 	if stops.empty:
-		return stops.assign(sequence_id=pd.Series(dtype=int), sequence_index=pd.Series(dtype=int))
+		no_rows = np.empty(0, dtype=np.int64)
+		return stops.assign(sequence_id=pd.Series(dtype=int), sequence_index=pd.Series(dtype=int)), no_rows, no_rows
 
-	stops = stops.sort_values(["test_name", "stage_serial", "test_datetime"]).reset_index(drop=True).copy()
-	sequence_ids = []
-	sequence_index = []
-	current_seq = 0
-	last_key = (None, None)
-	last_seq_index_for_key: dict[tuple[str, str], int] = {}
-
-	for _, row in stops.iterrows():
-		key = (str(row["test_name"]), str(row["stage_serial"]))
-		if key != last_key:
-			current_seq += 1
-			sequence_ids.append(current_seq)
-			sequence_index.append(1)
-			last_seq_index_for_key[key] = 1
-			last_key = key
-		else:
-			sequence_ids.append(current_seq)
-			last_seq_index_for_key[key] += 1
-			sequence_index.append(last_seq_index_for_key[key])
+	# Sort by (test_name, stage_serial, test_datetime) on integer codes instead of strings
+	test_codes = sort_codes(stops["test_name"])
+	stage_codes = sort_codes(stops["stage_serial"])
+	timestamps = stops["test_datetime"].to_numpy().view("i8")
+	order = np.lexsort((timestamps, stage_codes, test_codes))
+	stops = stops.iloc[order].reset_index(drop=True)
+	sequence_ids, sequence_index = sequence_runs(test_codes[order], stage_codes[order])
 
 	stops["sequence_id"] = sequence_ids
 	stops["sequence_index"] = sequence_index
-	return stops
+	first_idx, last_idx = sequence_bounds(sequence_ids)
+	return stops, first_idx, last_idx
 
 
-def summarize_sequences_by_test_stage(stops_with_seq: pd.DataFrame) -> pd.DataFrame:
+def summarize_sequences_by_test_stage(stops_with_seq: pd.DataFrame, first_idx: np.ndarray, last_idx: np.ndarray) -> pd.DataFrame:
 	if "sequence_id" not in stops_with_seq.columns:
 		return pd.DataFrame()
+	# Sequences are contiguous and time-ordered, so their first/last rows hold every summary value
 	summary = (
-		stops_with_seq.groupby("sequence_id")
-			.agg(
-				start_time=("test_datetime", "min"),
-				end_time=("test_datetime", "max"),
-				num_stops=("sequence_index", "max"),
-				user_name=("user_name", "first"),
-				test_name=("test_name", "first"),
-				part_number=("part_number", "first"),
-				stage_serial=("stage_serial", "first"),
-			)
-			.reset_index()
+		stops_with_seq.iloc[first_idx][["sequence_id", "test_datetime", "user_name", "test_name", "part_number", "stage_serial"]]
+			.rename(columns={"test_datetime": "start_time"})
+			.reset_index(drop=True)
 	)
+	summary.insert(2, "end_time", stops_with_seq["test_datetime"].to_numpy()[last_idx])
+	summary.insert(3, "num_stops", last_idx - first_idx + 1)
 	return summary
 
 
@@ -199,24 +391,63 @@ def plot_sequence_histogram(seq_summary: pd.DataFrame) -> str:
 	return save_plotly_html(fig, "consecutive_stops_hist.html")
 
 
+def runlog_fingerprint(csv_path: str) -> dict:
+	stat = os.stat(csv_path)
+	with open(csv_path, "rb") as f:
+		head_digest = hashlib.sha256(f.read(CACHE_HASH_BYTES)).hexdigest()
+	# Outputs also depend on this script (code and configuration), so a change to it invalidates the cache
+	with open(__file__, "rb") as f:
+		script_digest = hashlib.sha256(f.read()).hexdigest()
+	return {"mtime": stat.st_mtime, "size": stat.st_size, "sha256_head": head_digest, "script_sha256": script_digest}
+
+
+def outputs_up_to_date(fingerprint: dict) -> bool:
+	# Outputs are reusable only if every file exists and was built from the same RunLog and script
+	if not all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in OUTPUT_FILES):
+		return False
+	try:
+		with open(os.path.join(OUTPUT_DIR, CACHE_MANIFEST), encoding="utf-8") as f:
+			return json.load(f) == fingerprint
+	except (OSError, ValueError):
+		return False
+
+
+def save_cache_manifest(fingerprint: dict) -> str:
+	ensure_output_dir()
+	path = os.path.join(OUTPUT_DIR, CACHE_MANIFEST)
+	with open(path, "w", encoding="utf-8") as f:
+		json.dump(fingerprint, f)
+	return path
+
+
 def main() -> int:
 	try:
+		fingerprint = runlog_fingerprint(RUNLOG_PATH)
+		if outputs_up_to_date(fingerprint):
+			print("RunLog.csv unchanged since last run; outputs in", OUTPUT_DIR, "are up to date")
+			return 0
+
 		df = read_runlog(RUNLOG_PATH)
 		stops = filter_stops(df)
 		stops_csv = save_stops_csv(stops)
 
 		# Visualizations (Plotly HTML)
-		user_plot = plot_stops_per_user(stops) if not stops.empty else ""
-		test_plot = plot_stops_per_test(stops) if not stops.empty else ""
-		part_plot = plot_stops_per_part(stops) if not stops.empty else ""
+		# Counts per key are computed once (already sorted descending) and handed to the plots
+		user_counts = stops["user_name"].value_counts()
+		test_counts = stops["test_name"].value_counts()
+		part_counts = stops["part_number"].value_counts()
+		user_plot = plot_stops_per_user(user_counts) if not stops.empty else ""
+		test_plot = plot_stops_per_test(test_counts) if not stops.empty else ""
+		part_plot = plot_stops_per_part(part_counts) if not stops.empty else ""
 		stage_plot = plot_stops_per_stage(stops) if not stops.empty else ""
 
 		# Sequence analysis by (Test Name, Stage Serial Number)
-		stops_seq = analyze_consecutive_stops_by_test_stage(stops)
-		seq_summary = summarize_sequences_by_test_stage(stops_seq)
+		stops_seq, seq_first_idx, seq_last_idx = analyze_consecutive_stops_by_test_stage(stops)
+		seq_summary = summarize_sequences_by_test_stage(stops_seq, seq_first_idx, seq_last_idx)
 		seq_csv = os.path.join(OUTPUT_DIR, "consecutive_stops_sequences.csv")
-		seq_summary.to_csv(seq_csv, index=False)
+		write_csv_table(seq_summary, seq_csv)
 		seq_hist = plot_sequence_histogram(seq_summary)
+		save_cache_manifest(fingerprint)
 
 		print("Stopped events saved to:", stops_csv)
 		if user_plot: print("HTML saved:", user_plot)